@@ -9,6 +9,8 @@ Anterix Spectrum Defender game using OpenAI's DALL-E API.
 
 Usage:
     python generate_sprites.py [--all] [--sprite <name>] [--list]
+                               [--max-concurrency N] [--rpm N]
+                               [--no-cache] [--optimize] [--palette-colors N]
 
 Environment Variables:
     OPENAI_API_KEY: Your OpenAI API key (required)
@@ -21,18 +23,24 @@ Output:
 import os
 import sys
 import json
+import asyncio
+import functools
 import logging
 import argparse
-import base64
+import hashlib
+import random
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 # Third-party imports with error handling
+# (openai is imported lazily by _get_openai so --list starts quickly)
 try:
-    from openai import OpenAI
+    import aiofiles
 except ImportError:
-    print("ERROR: openai package not installed. Run: pip install openai")
+    print("ERROR: aiofiles package not installed. Run: pip install aiofiles")
     sys.exit(1)
 
 try:
@@ -42,6 +50,12 @@ except ImportError:
     print("ERROR: Pillow package not installed. Run: pip install Pillow")
     sys.exit(1)
 
+try:
+    import oxipng
+except ImportError:
+    print("WARNING: pyoxipng not installed. PNGs will only be optimized by Pillow.")
+    oxipng = None
+
 try:
     from dotenv import load_dotenv
 except ImportError:
@@ -49,11 +63,22 @@ except ImportError:
     load_dotenv = None
 
 try:
-    from tqdm import tqdm
+    import diskcache
+except ImportError:
+    print("WARNING: diskcache not installed. Generated sprites will not be cached.")
+    diskcache = None
+
+try:
+    from aiolimiter import AsyncLimiter
 except ImportError:
-    # Fallback if tqdm not available
-    def tqdm(iterable, **kwargs):
-        return iterable
+    print("WARNING: aiolimiter not installed. Requests will not be paced to --rpm.")
+    AsyncLimiter = None
+
+try:
+    from tqdm.asyncio import tqdm as atqdm
+except ImportError:
+    # Fallback to plain asyncio.gather if tqdm not available
+    atqdm = None
 
 try:
     import colorlog
@@ -91,11 +116,37 @@ except ImportError:
 # Output directory for generated sprites
 SPRITES_DIR = Path(__file__).parent.parent / "sprites"
 
+# On-disk cache of generated images, keyed by request parameters
+CACHE_DIR = SPRITES_DIR / ".cache"
+
 # DALL-E configuration
 DALLE_MODEL = "dall-e-3"
 DALLE_SIZE = "1024x1024"
 DALLE_QUALITY = "standard"
 
+# Maximum simultaneous DALL-E requests (DALL-E 3 tier-1 allows ~5 images/min)
+DEFAULT_MAX_CONCURRENCY = 5
+
+# Maximum DALL-E requests started per minute (token-bucket pacing)
+DEFAULT_RPM = 5
+
+# Retry policy for transient API failures (exponential backoff with jitter)
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 2.0   # seconds
+RETRY_MAX_DELAY = 60.0   # seconds
+
+# PNG optimization: oxipng recompression level, and the largest palette
+# a PNG can hold (for optional lossy quantization via --palette-colors)
+OXIPNG_LEVEL = 4
+PNG_MAX_PALETTE_COLORS = 256
+
+# Shared HTTP connection pool for all API calls
+HTTP_MAX_CONNECTIONS = 50
+HTTP_TIMEOUT = 120.0     # seconds
+
+# Generated images are streamed to disk in chunks of this size
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 # Color palette for the game (neon retro)
 COLOR_PALETTE = {
     "cyan": "#00ffff",
@@ -110,371 +161,141 @@ COLOR_PALETTE = {
 # ============================================================
 # SPRITE DEFINITIONS
 # ============================================================
-# Each sprite has a name, description, and detailed DALL-E prompt
-
-SPRITE_DEFINITIONS = {
-    # Player ship - "A" made of vertical lines
-    "player_ship": {
-        "filename": "player_ship.png",
-        "description": "Player spaceship shaped like letter A",
-        "prompt": """Create a pixel art sprite of a spaceship shaped like the capital letter "A" made entirely of vertical glowing cyan lines. 
-
-Style requirements:
-- 32-bit retro pixel art style
-- The ship is the letter "A" rotated so the point faces upward
-- Made of multiple parallel vertical cyan (#00FFFF) glowing lines
-- Neon glow effect around the lines
-- Transparent background (use solid black #000000 for transparency keying)
-- Size should fill most of the 1024x1024 canvas
-- Clean, crisp pixel edges
-- Slight blue-white glow emanating from the lines
-- The crossbar of the "A" should also be visible as horizontal lines
+# Each sprite has a filename, description, and the parts of its DALL-E
+# prompt: a subject line, sprite-specific style details, and a closing
+# aesthetic note. Definitions live in sprite_definitions.json and are
+# loaded on first use.
 
-The aesthetic should match classic arcade games like Asteroids and Tempest with vector-style graphics."""
-    },
-    
-    # Player ship with thrust
-    "player_ship_thrust": {
-        "filename": "player_ship_thrust.png",
-        "description": "Player spaceship with engine thrust",
-        "prompt": """Create a pixel art sprite of a spaceship shaped like the capital letter "A" made of vertical glowing cyan lines, with an orange/yellow thrust flame coming from the bottom.
+SPRITE_DEFINITIONS_FILE = Path(__file__).parent / "sprite_definitions.json"
 
-Style requirements:
+# Style requirements shared by every sprite; per-sprite details follow
+STYLE_PRELUDE = """Style requirements:
 - 32-bit retro pixel art style
-- The ship is the letter "A" rotated so the point faces upward
-- Made of multiple parallel vertical cyan (#00FFFF) glowing lines
-- Orange (#FF6600) and yellow thrust flame at the bottom
-- Neon glow effect around the lines and flame
 - Transparent background (use solid black #000000 for transparency keying)
-- Size should fill most of the 1024x1024 canvas
-- Clean, crisp pixel edges
-- The thrust flame should look like classic arcade thruster fire
+- Clean, crisp pixel edges"""
 
-The aesthetic should match classic arcade games like Asteroids with vector-style graphics."""
-    },
-    
-    # Signal Disruptor enemy
-    "signal_disruptor": {
-        "filename": "signal_disruptor.png",
-        "description": "Signal interference enemy",
-        "prompt": """Create a pixel art sprite of an alien enemy representing signal interference/disruption.
 
-Style requirements:
-- 32-bit retro pixel art style
-- Circular shape with a zigzag/sine wave pattern inside
-- Magenta (#FF00FF) color with neon glow
-- Looks like a radio wave or signal being disrupted
-- Should appear slightly menacing but abstract
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: circular, about 64x64 pixels scaled up to fill canvas
-- Clean, crisp pixel edges
-- Pulsing glow effect appearance
-
-The aesthetic should match Space Invaders but with a telecommunications theme."""
-    },
-    
-    # Data Packet enemy (bonus target)
-    "data_packet": {
-        "filename": "data_packet.png",
-        "description": "Fast moving data packet bonus enemy",
-        "prompt": """Create a pixel art sprite of a small, fast data packet enemy.
-
-Style requirements:
-- 32-bit retro pixel art style
-- Small square/rectangular shape representing a data packet
-- Lime green (#66FF33) color with neon glow
-- Binary-style dots or "10" pattern inside
-- Appears to be moving fast (motion lines optional)
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: small, about 32x32 pixels scaled up to fill canvas
-- Clean, crisp pixel edges
-- Should look like digital data in transit
-
-The aesthetic should be retro-futuristic like Tron."""
-    },
+@functools.lru_cache(maxsize=None)
+def _load_sprite_definitions() -> dict:
+    """
+    Load the sprite manifest from disk (cached after the first call).
     
-    # Network Node enemy (splits when destroyed)
-    "network_node_large": {
-        "filename": "network_node_large.png",
-        "description": "Large network node that splits",
-        "prompt": """Create a pixel art sprite of a large network node/hub enemy.
-
-Style requirements:
-- 32-bit retro pixel art style
-- Hexagonal shape representing a network node
-- Pink-red (#FF3366) color with neon glow
-- Internal connecting lines like a network diagram
-- Center dot representing the node core
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: large hexagon, about 100x100 pixels scaled up
-- Clean, crisp pixel edges
-- Should look like network infrastructure
+    Returns:
+        Dictionary mapping sprite names to their definitions
+    """
+    with open(SPRITE_DEFINITIONS_FILE, encoding="utf-8") as f:
+        return json.load(f)
 
-The aesthetic should be cyberpunk/tech style."""
-    },
-    
-    "network_node_medium": {
-        "filename": "network_node_medium.png",
-        "description": "Medium network node",
-        "prompt": """Create a pixel art sprite of a medium-sized network node enemy.
 
-Style requirements:
-- 32-bit retro pixel art style
-- Hexagonal shape, smaller than parent
-- Pink-red (#FF3366) color with neon glow
-- Simpler internal pattern than the large version
-- Center dot representing the node core
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: medium hexagon, about 72x72 pixels scaled up
-- Clean, crisp pixel edges
+# ============================================================
+# HELPERS
+# ============================================================
 
-Same style as the large network node but smaller and simpler."""
-    },
+def _get_openai():
+    """
+    Import the OpenAI SDK on first use.
     
-    "network_node_small": {
-        "filename": "network_node_small.png",
-        "description": "Small network node",
-        "prompt": """Create a pixel art sprite of a small network node enemy.
-
-Style requirements:
-- 32-bit retro pixel art style
-- Hexagonal shape, smallest version
-- Pink-red (#FF3366) color with neon glow
-- Minimal internal detail, mostly solid with glow
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: small hexagon, about 40x40 pixels scaled up
-- Clean, crisp pixel edges
-
-Same style as the larger network nodes but smallest and simplest."""
-    },
+    The SDK (and httpx beneath it) is slow to import and only needed when
+    actually generating, so listing sprites never pays for it.
     
-    # Legacy Tower (asteroid-like)
-    "legacy_tower": {
-        "filename": "legacy_tower.png",
-        "description": "Old infrastructure asteroid",
-        "prompt": """Create a pixel art sprite of an old, decommissioned communication tower floating in space like an asteroid.
+    Returns:
+        The openai module
+    """
+    try:
+        import openai
+    except ImportError:
+        print("ERROR: openai package not installed. Run: pip install openai")
+        sys.exit(1)
+    return openai
 
-Style requirements:
-- 32-bit retro pixel art style
-- Irregular rocky asteroid shape with an old antenna/tower on top
-- Gray (#888888) color - appears old and outdated
-- Subtle darker shadows and lighter highlights
-- Small antenna or transmission tower element visible
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: large irregular shape, about 140x140 pixels scaled up
-- Clean, crisp pixel edges
-- Should look like abandoned space debris
 
-The aesthetic should be like Asteroids but with tech infrastructure elements."""
-    },
+def _build_prompt(sprite_def: dict) -> str:
+    """
+    Assemble the full DALL-E prompt for a sprite definition.
     
-    # Spectrum Jammer (Boss)
-    "spectrum_jammer": {
-        "filename": "spectrum_jammer.png",
-        "description": "Boss enemy - spectrum jamming device",
-        "prompt": """Create a pixel art sprite of a large, menacing spectrum jamming device boss enemy.
+    Args:
+        sprite_def: Sprite definition from sprite_definitions.json
+        
+    Returns:
+        Prompt text: subject, shared style prelude, details, aesthetic
+    """
+    details = "\n".join(f"- {detail}" for detail in sprite_def["details"])
+    return (
+        f"{sprite_def['subject']}\n\n"
+        f"{STYLE_PRELUDE}\n{details}\n\n"
+        f"{sprite_def['aesthetic']}"
+    )
 
-Style requirements:
-- 32-bit retro pixel art style
-- Large circular shape with multiple concentric rings
-- Bright red (#FF0000) primary color with neon glow
-- Internal radial lines emanating from center (jamming waves)
-- Multiple rings: outer ring, middle ring, inner core
-- Appears powerful and dangerous
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: large, about 200x200 pixels scaled up to fill canvas
-- Clean, crisp pixel edges
-- Pulsing/energy effect appearance
 
-The aesthetic should be intimidating boss enemy style from classic arcade shooters."""
-    },
+def _print_definitions():
+    """Print list of all available sprites."""
+    sprite_definitions = _load_sprite_definitions()
     
-    # Power-ups
-    "powerup_bandwidth": {
-        "filename": "powerup_bandwidth.png",
-        "description": "Bandwidth boost power-up (rapid fire)",
-        "prompt": """Create a pixel art sprite of a "Bandwidth Boost" power-up icon.
-
-Style requirements:
-- 32-bit retro pixel art style
-- Circular outer ring with inner square
-- Light blue (#00AAFF) color with neon glow
-- Letter "B" in the center
-- Spinning/rotating appearance
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: about 60x60 pixels scaled up
-- Clean, crisp pixel edges
-- Collectible power-up appearance
-
-Should look like a beneficial pickup item from arcade games."""
-    },
+    print("\n" + "=" * 60)
+    print("AVAILABLE SPRITES")
+    print("=" * 60)
     
-    "powerup_shield": {
-        "filename": "powerup_shield.png",
-        "description": "Signal shield power-up (invincibility)",
-        "prompt": """Create a pixel art sprite of a "Signal Shield" power-up icon.
-
-Style requirements:
-- 32-bit retro pixel art style
-- Circular outer ring with inner square
-- Bright green (#00FF00) color with neon glow
-- Letter "S" in the center
-- Protective/defensive appearance
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: about 60x60 pixels scaled up
-- Clean, crisp pixel edges
-- Collectible power-up appearance
-
-Should look like a shield/defense pickup from arcade games."""
-    },
+    for name, definition in sprite_definitions.items():
+        print(f"\n  {name}")
+        print(f"    File: {definition['filename']}")
+        print(f"    Description: {definition['description']}")
     
-    "powerup_spread": {
-        "filename": "powerup_spread.png",
-        "description": "Spectrum spread power-up (triple shot)",
-        "prompt": """Create a pixel art sprite of a "Spectrum Spread" power-up icon.
+    print("\n" + "=" * 60)
+    print(f"Total: {len(sprite_definitions)} sprites")
+    print("=" * 60 + "\n")
 
-Style requirements:
-- 32-bit retro pixel art style
-- Circular outer ring with inner square
-- Bright yellow (#FFFF00) color with neon glow
-- Number "3" in the center (representing triple shot)
-- Spreading/expanding appearance
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: about 60x60 pixels scaled up
-- Clean, crisp pixel edges
-- Collectible power-up appearance
 
-Should look like a weapon upgrade pickup from arcade games."""
-    },
+def _optimize_png(image_bytes: bytes, palette_colors: Optional[int] = None) -> bytes:
+    """
+    Re-encode an image as a size-optimized PNG.
     
-    "powerup_surge": {
-        "filename": "powerup_surge.png",
-        "description": "Network surge power-up (bomb)",
-        "prompt": """Create a pixel art sprite of a "Network Surge" power-up icon (screen-clearing bomb).
-
-Style requirements:
-- 32-bit retro pixel art style
-- Circular outer ring with inner square
-- Hot pink/red (#FF0066) color with neon glow
-- Exclamation mark "!" in the center
-- Explosive/powerful appearance
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: about 60x60 pixels scaled up
-- Clean, crisp pixel edges
-- Rare/powerful collectible appearance
-
-Should look like a special weapon pickup from arcade games."""
-    },
+    The PNG is saved with maximum zlib compression and, if available, run
+    through oxipng. If palette_colors is given, the image is first reduced
+    to that many colors (lossy, but DALL-E output has thousands of glow
+    shades and shrinks several-fold). Runs in a worker process, so it must
+    stay a picklable module-level function.
     
-    # Projectile
-    "projectile_player": {
-        "filename": "projectile_player.png",
-        "description": "Player spectrum beam projectile",
-        "prompt": """Create a pixel art sprite of a player's "Spectrum Beam" projectile.
-
-Style requirements:
-- 32-bit retro pixel art style
-- Elongated ellipse/beam shape
-- Bright yellow (#FFFF00) color with neon glow
-- Energy beam appearance
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: elongated, about 24x8 pixels scaled up
-- Clean, crisp pixel edges
-- Fast-moving energy appearance
-
-Should look like a laser/beam from classic space shooters."""
-    },
+    Args:
+        image_bytes: Decoded image returned by the API
+        palette_colors: Quantize to this many colors, or None to stay lossless
+        
+    Returns:
+        Optimized PNG bytes
+    """
+    image = Image.open(io.BytesIO(image_bytes))
     
-    # Explosion frames
-    "explosion_1": {
-        "filename": "explosion_1.png",
-        "description": "Explosion animation frame 1",
-        "prompt": """Create a pixel art sprite of an explosion, frame 1 of 4 (smallest/beginning).
-
-Style requirements:
-- 32-bit retro pixel art style
-- Small starburst/explosion shape
-- Orange, yellow, and white colors
-- Beginning of explosion - compact
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: small, about 32x32 pixels scaled up
-- Clean, crisp pixel edges
-
-Classic arcade explosion beginning frame."""
-    },
+    if palette_colors is not None:
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        # MEDIANCUT gives the best palette but can't handle alpha
+        if image.mode == "RGB":
+            method = Image.Quantize.MEDIANCUT
+        else:
+            method = Image.Quantize.FASTOCTREE
+        image = image.quantize(colors=palette_colors, method=method)
     
-    "explosion_2": {
-        "filename": "explosion_2.png",
-        "description": "Explosion animation frame 2",
-        "prompt": """Create a pixel art sprite of an explosion, frame 2 of 4 (expanding).
-
-Style requirements:
-- 32-bit retro pixel art style
-- Medium expanding explosion shape
-- Orange, yellow, and white colors
-- Explosion expanding outward
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: medium, about 64x64 pixels scaled up
-- Clean, crisp pixel edges
-
-Classic arcade explosion mid frame."""
-    },
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", optimize=True, compress_level=9)
+    png_bytes = buffer.getvalue()
     
-    "explosion_3": {
-        "filename": "explosion_3.png",
-        "description": "Explosion animation frame 3",
-        "prompt": """Create a pixel art sprite of an explosion, frame 3 of 4 (large).
-
-Style requirements:
-- 32-bit retro pixel art style
-- Large explosion shape
-- Orange, yellow, red, and white colors
-- Explosion at maximum size
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: large, about 96x96 pixels scaled up
-- Clean, crisp pixel edges
-
-Classic arcade explosion peak frame."""
-    },
+    if oxipng is not None:
+        png_bytes = oxipng.optimize_from_memory(png_bytes, level=OXIPNG_LEVEL)
     
-    "explosion_4": {
-        "filename": "explosion_4.png",
-        "description": "Explosion animation frame 4",
-        "prompt": """Create a pixel art sprite of an explosion, frame 4 of 4 (dissipating).
+    return png_bytes
 
-Style requirements:
-- 32-bit retro pixel art style
-- Dissipating explosion particles
-- Fading orange, yellow, and gray colors
-- Explosion breaking apart and fading
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: large but sparse, about 96x96 pixels scaled up
-- Clean, crisp pixel edges
 
-Classic arcade explosion ending frame."""
-    },
+def _cache_key(prompt: str) -> str:
+    """
+    Build a cache key from everything that affects the generated image.
     
-    # Title logo
-    "title_logo": {
-        "filename": "title_logo.png",
-        "description": "Anterix game title logo",
-        "prompt": """Create a pixel art logo for "ANTERIX SPECTRUM DEFENDER" arcade game.
-
-Style requirements:
-- 32-bit retro pixel art style
-- Text "ANTERIX" in large bold letters at top
-- Text "SPECTRUM DEFENDER" below in slightly smaller letters
-- Cyan (#00FFFF) and Magenta (#FF00FF) neon colors
-- Retro arcade game title style
-- Glowing neon effect
-- Transparent background (use solid black #000000 for transparency keying)
-- Size: wide banner, fills the canvas
-- Clean, crisp pixel edges
-- 80s arcade aesthetic
-
-Should look like a classic arcade game title screen."""
-    }
-}
+    Args:
+        prompt: DALL-E prompt text
+        
+    Returns:
+        Hex SHA-256 digest of model, size, quality and prompt
+    """
+    key = f"{DALLE_MODEL}|{DALLE_SIZE}|{DALLE_QUALITY}|{prompt}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
 
 
 # ============================================================
@@ -492,12 +313,24 @@ class SpriteGenerator:
     - Error handling and retries
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 rpm_limit: int = DEFAULT_RPM,
+                 use_cache: bool = True,
+                 post_process: bool = False,
+                 palette_colors: Optional[int] = None):
         """
         Initialize the sprite generator.
         
         Args:
             api_key: OpenAI API key (if not provided, uses environment variable)
+            max_concurrency: Maximum number of DALL-E requests in flight at once
+            rpm_limit: Maximum number of DALL-E requests started per minute
+            use_cache: Serve unchanged prompts from the on-disk cache
+            post_process: Re-encode PNGs to shrink them (otherwise the API
+                bytes are written as-is)
+            palette_colors: When post-processing, quantize to this many
+                colors (lossy); None keeps full color
         """
         # Load environment variables from .env file if available
         if load_dotenv:
@@ -513,82 +346,327 @@ class SpriteGenerator:
             )
         
         # Initialize OpenAI client
+        openai = _get_openai()
+        import httpx
+        
+        # HTTP/2 lets concurrent requests share one multiplexed connection
         try:
-            self.client = OpenAI(api_key=self.api_key)
+            import h2  # noqa: F401 -- required by httpx for HTTP/2
+            http2 = True
+        except ImportError:
+            logger.warning("h2 not installed; using HTTP/1.1. Run: pip install httpx[http2]")
+            http2 = False
+        
+        # Transient failures that _request_image retries with backoff
+        self._retryable_errors = (
+            openai.RateLimitError,
+            openai.APITimeoutError,
+            openai.APIConnectionError,
+            openai.InternalServerError,
+        )
+        
+        try:
+            # One pooled HTTP client for every request keeps TLS sessions
+            # alive instead of reconnecting per sprite (or, over HTTP/2,
+            # multiplexes them all on a single connection)
+            self.http_client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_CONNECTIONS
+                ),
+                timeout=httpx.Timeout(HTTP_TIMEOUT)
+            )
+            
+            # Retries are handled by _request_image so backoff is applied
+            # outside the concurrency semaphore
+            self.client = openai.AsyncOpenAI(
+                api_key=self.api_key,
+                http_client=self.http_client,
+                max_retries=0
+            )
             logger.info("OpenAI client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize OpenAI client: {e}")
             raise
         
+        self.post_process = post_process
+        self.palette_colors = palette_colors
+        
+        # Worker processes for CPU-bound PNG optimization (see _ensure_pool)
+        self.pool = None
+        
+        # Requests currently in progress, keyed by cache key, so identical
+        # prompts within one run share a single API call
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        # Bound in-flight requests so a full batch stays under the rate limit.
+        # The semaphore is created on first use: before Python 3.10 it binds
+        # to the current event loop, which doesn't exist yet here
+        self._max_concurrency = max_concurrency
+        self._sem = None
+        
+        # Pace request starts so bursts don't exceed the per-minute limit
+        self._limiter = None
+        if AsyncLimiter is not None:
+            self._limiter = AsyncLimiter(rpm_limit, 60)
+        
         # Ensure sprites directory exists
         SPRITES_DIR.mkdir(parents=True, exist_ok=True)
         logger.info(f"Sprites directory: {SPRITES_DIR}")
+        
+        # Open the image cache (skipped if disabled or diskcache is missing)
+        self.cache = None
+        if use_cache and diskcache is not None:
+            self.cache = diskcache.Cache(str(CACHE_DIR))
+            logger.info(f"Image cache: {CACHE_DIR}")
+    
+    async def close(self):
+        """Close the shared HTTP client and shut down the worker pool."""
+        await self.http_client.aclose()
+        if self.pool is not None:
+            # shutdown() blocks until workers exit; keep it off the loop
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.pool.shutdown)
+    
+    def _ensure_pool(self, sprite_count: int):
+        """
+        Start the PNG optimization pool if post-processing is enabled.
+        
+        Optimization is CPU-bound, so it is spread across cores, but never
+        with more workers than there are sprites to process.
+        
+        Args:
+            sprite_count: Number of sprites about to be generated
+        """
+        if self.post_process and self.pool is None:
+            workers = min(os.cpu_count() or 1, sprite_count)
+            self.pool = ProcessPoolExecutor(max_workers=workers)
+    
+    async def _request_image(self, sprite_name: str, prompt: str) -> str:
+        """
+        Call the DALL-E API, retrying transient failures.
+        
+        Rate limits, timeouts, connection drops and 5xx responses are retried
+        with exponential backoff plus jitter; other errors propagate at once.
+        
+        Args:
+            sprite_name: Sprite name (used for logging)
+            prompt: DALL-E prompt text
+            
+        Returns:
+            Temporary URL of the generated PNG
+        """
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self._max_concurrency)
+        
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                if self._limiter is not None:
+                    await self._limiter.acquire()
+                async with self._sem:
+                    response = await self.client.images.generate(
+                        model=DALLE_MODEL,
+                        prompt=prompt,
+                        size=DALLE_SIZE,
+                        quality=DALLE_QUALITY,
+                        n=1,
+                        response_format="url"  # Download separately, in chunks
+                    )
+                return response.data[0].url
+            except self._retryable_errors as e:
+                if attempt == MAX_ATTEMPTS - 1:
+                    raise
+                await self._backoff(sprite_name, attempt, e)
+    
+    async def _backoff(self, sprite_name: str, attempt: int, error: Exception):
+        """
+        Log a transient failure and sleep before the next attempt.
+        
+        Args:
+            sprite_name: Sprite name (used for logging)
+            attempt: Zero-based number of the attempt that failed
+            error: The exception that caused the failure
+        """
+        delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+        delay += random.uniform(0, 1)
+        logger.warning(
+            f"Transient error for '{sprite_name}' "
+            f"(attempt {attempt + 1}/{MAX_ATTEMPTS}): {error}. "
+            f"Retrying in {delay:.1f}s"
+        )
+        await asyncio.sleep(delay)
+    
+    async def _download(self, sprite_name: str, url: str, output_path: Path):
+        """
+        Stream an image from a URL to disk without buffering it in memory.
+        
+        The file is written to a temporary name and moved into place only
+        once complete, so a failed download never clobbers an existing sprite.
+        Connection errors and 5xx responses are retried with the same
+        backoff as API calls, since the image has already been paid for.
+        
+        Args:
+            sprite_name: Sprite name (used for logging)
+            url: Image URL returned by the API
+            output_path: Destination file path
+        """
+        import httpx
+        
+        partial_path = output_path.with_name(output_path.name + ".part")
+        
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                async with self.http_client.stream("GET", url) as response:
+                    response.raise_for_status()
+                    async with aiofiles.open(partial_path, "wb") as f:
+                        async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                            await f.write(chunk)
+                partial_path.replace(output_path)
+                return
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                retryable = (
+                    not isinstance(e, httpx.HTTPStatusError)
+                    or e.response.status_code >= 500
+                )
+                if not retryable or attempt == MAX_ATTEMPTS - 1:
+                    raise
+                await self._backoff(sprite_name, attempt, e)
+            finally:
+                partial_path.unlink(missing_ok=True)
+    
+    def _store_in_cache(self, cache_key: str, path: Path):
+        """Copy a file into the image cache without reading it into memory."""
+        with open(path, "rb") as f:
+            self.cache.set(cache_key, f, read=True)
+    
+    async def _produce_sprite(self, sprite_name: str, prompt: str,
+                              cache_key: str, output_path: Path):
+        """
+        Write a sprite image to disk from the cache or a fresh API call.
+        
+        Args:
+            sprite_name: Sprite name (used for logging)
+            prompt: DALL-E prompt text
+            cache_key: Key from _cache_key(prompt)
+            output_path: Destination file path
+        """
+        loop = asyncio.get_running_loop()
+        
+        # Serve unchanged prompts from the cache instead of re-billing
+        cached = None
+        if self.cache is not None:
+            cached = await loop.run_in_executor(None, self.cache.get, cache_key)
+        
+        if cached is not None:
+            logger.info(f"Using cached image for: {sprite_name}")
+            async with aiofiles.open(output_path, "wb") as f:
+                await f.write(cached)
+        else:
+            # Call DALL-E API, then stream the PNG straight to disk
+            url = await self._request_image(sprite_name, prompt)
+            await self._download(sprite_name, url, output_path)
+        
+            if self.cache is not None:
+                await loop.run_in_executor(
+                    None, self._store_in_cache, cache_key, output_path
+                )
+        
+        # DALL-E already returns a valid PNG; only re-encode when asked.
+        # Work runs off the event loop so concurrent generations are
+        # not blocked by PNG encoding or disk I/O
+        if self.post_process:
+            async with aiofiles.open(output_path, "rb") as f:
+                image_bytes = await f.read()
+            png_bytes = await loop.run_in_executor(
+                self.pool, _optimize_png, image_bytes, self.palette_colors
+            )
+            async with aiofiles.open(output_path, "wb") as f:
+                await f.write(png_bytes)
     
-    def generate_sprite(self, sprite_name: str) -> Optional[Path]:
+    async def generate_sprite(self, sprite_name: str) -> Optional[Path]:
         """
         Generate a single sprite using DALL-E.
         
         Args:
-            sprite_name: Name of the sprite from SPRITE_DEFINITIONS
+            sprite_name: Name of the sprite in sprite_definitions.json
             
         Returns:
             Path to saved sprite file, or None if generation failed
         """
-        if sprite_name not in SPRITE_DEFINITIONS:
+        sprite_definitions = _load_sprite_definitions()
+        
+        if sprite_name not in sprite_definitions:
             logger.error(f"Unknown sprite: {sprite_name}")
-            logger.info(f"Available sprites: {', '.join(SPRITE_DEFINITIONS.keys())}")
+            logger.info(f"Available sprites: {', '.join(sprite_definitions.keys())}")
             return None
         
-        sprite_def = SPRITE_DEFINITIONS[sprite_name]
+        sprite_def = sprite_definitions[sprite_name]
         filename = sprite_def["filename"]
-        prompt = sprite_def["prompt"]
+        prompt = _build_prompt(sprite_def)
         description = sprite_def["description"]
         
         logger.info(f"Generating sprite: {sprite_name} ({description})")
         
+        output_path = SPRITES_DIR / filename
+        cache_key = _cache_key(prompt)
+        loop = asyncio.get_running_loop()
+        
+        # No-op when generate_all_sprites has already sized the pool
+        self._ensure_pool(1)
+        
         try:
-            # Call DALL-E API
-            response = self.client.images.generate(
-                model=DALLE_MODEL,
-                prompt=prompt,
-                size=DALLE_SIZE,
-                quality=DALLE_QUALITY,
-                n=1,
-                response_format="b64_json"  # Get base64 data directly
-            )
-            
-            # Extract image data
-            image_data = response.data[0].b64_json
-            
-            # Decode and save image
-            image_bytes = base64.b64decode(image_data)
-            image = Image.open(io.BytesIO(image_bytes))
-            
-            # Save to sprites directory
-            output_path = SPRITES_DIR / filename
-            image.save(output_path, "PNG")
+            inflight = self._inflight.get(cache_key)
+            if inflight is not None:
+                # An identical prompt is already being generated; reuse it
+                logger.info(f"Sharing in-flight request for: {sprite_name}")
+                source_path = await inflight
+                if source_path is None:
+                    raise RuntimeError("shared request for identical prompt failed")
+                if source_path != output_path:
+                    await loop.run_in_executor(
+                        None, shutil.copyfile, source_path, output_path
+                    )
+            else:
+                future = loop.create_future()
+                self._inflight[cache_key] = future
+                try:
+                    await self._produce_sprite(sprite_name, prompt, cache_key, output_path)
+                    future.set_result(output_path)
+                finally:
+                    # Waiters see None if this request failed or was cancelled
+                    if not future.done():
+                        future.set_result(None)
+                    del self._inflight[cache_key]
             
-            logger.info(f"Saved sprite: {output_path}")
+            size_kb = output_path.stat().st_size // 1024
+            logger.info(f"Saved sprite: {output_path} ({size_kb} KB)")
             return output_path
             
         except Exception as e:
             logger.error(f"Failed to generate sprite '{sprite_name}': {e}")
             return None
     
-    def generate_all_sprites(self) -> dict:
+    async def generate_all_sprites(self) -> dict:
         """
-        Generate all defined sprites.
+        Generate all defined sprites concurrently.
         
         Returns:
             Dictionary mapping sprite names to their output paths (or None if failed)
         """
-        results = {}
-        sprite_names = list(SPRITE_DEFINITIONS.keys())
+        sprite_names = list(_load_sprite_definitions().keys())
         
         logger.info(f"Generating {len(sprite_names)} sprites...")
+        self._ensure_pool(len(sprite_names))
         
-        for sprite_name in tqdm(sprite_names, desc="Generating sprites"):
-            results[sprite_name] = self.generate_sprite(sprite_name)
+        # Start every request at once; DALL-E round-trips dominate runtime
+        tasks = [self.generate_sprite(sprite_name) for sprite_name in sprite_names]
+        if atqdm is not None:
+            # Advances as each sprite finishes; results keep input order
+            paths = await atqdm.gather(*tasks, desc="Generating sprites")
+        else:
+            paths = await asyncio.gather(*tasks)
+        results = dict(zip(sprite_names, paths))
         
         # Summary
         successful = sum(1 for path in results.values() if path is not None)
@@ -600,24 +678,59 @@ class SpriteGenerator:
     
     def list_sprites(self):
         """Print list of all available sprites."""
-        print("\n" + "=" * 60)
-        print("AVAILABLE SPRITES")
-        print("=" * 60)
-        
-        for name, definition in SPRITE_DEFINITIONS.items():
-            print(f"\n  {name}")
-            print(f"    File: {definition['filename']}")
-            print(f"    Description: {definition['description']}")
-        
-        print("\n" + "=" * 60)
-        print(f"Total: {len(SPRITE_DEFINITIONS)} sprites")
-        print("=" * 60 + "\n")
+        _print_definitions()
 
 
 # ============================================================
 # MAIN ENTRY POINT
 # ============================================================
 
+def _positive_int(value: str) -> int:
+    """argparse type for options that must be a whole number above zero."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def _palette_size(value: str) -> int:
+    """argparse type for --palette-colors: a valid PNG palette size."""
+    number = _positive_int(value)
+    if not 2 <= number <= PNG_MAX_PALETTE_COLORS:
+        raise argparse.ArgumentTypeError(
+            f"must be between 2 and {PNG_MAX_PALETTE_COLORS}, got {number}"
+        )
+    return number
+
+
+def _run_event_loop(coro):
+    """
+    Run a coroutine to completion, on uvloop where available.
+    
+    uvloop schedules tasks faster than the default asyncio loop; it is
+    POSIX-only, so Windows (or a missing install) uses asyncio.run.
+    """
+    if sys.platform != "win32":
+        try:
+            import uvloop
+        except ImportError:
+            uvloop = None
+        if uvloop is not None:
+            return uvloop.run(coro)
+    return asyncio.run(coro)
+
+
+async def _run(generator: SpriteGenerator, coro):
+    """Await a generator coroutine, then close the generator's HTTP client."""
+    try:
+        return await coro
+    finally:
+        await generator.close()
+
+
 def main():
     """Main entry point for the sprite generator."""
     
@@ -630,6 +743,10 @@ Examples:
   python generate_sprites.py --list           # List all available sprites
   python generate_sprites.py --sprite player_ship  # Generate single sprite
   python generate_sprites.py --all            # Generate all sprites
+  python generate_sprites.py --all --no-cache # Regenerate, ignoring the image cache
+  python generate_sprites.py --all --optimize # Shrink PNGs after generating
+  python generate_sprites.py --all -p 32      # Shrink further to a 32-color palette
+  python generate_sprites.py --all -c 10 --rpm 15  # Higher-tier rate limits
 
 Environment:
   Set OPENAI_API_KEY environment variable before running.
@@ -662,30 +779,44 @@ Environment:
         help="OpenAI API key (overrides environment variable)"
     )
     
+    parser.add_argument(
+        "--max-concurrency", "-c",
+        type=_positive_int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help=f"Maximum simultaneous DALL-E requests (default: {DEFAULT_MAX_CONCURRENCY})"
+    )
+    
+    parser.add_argument(
+        "--rpm",
+        type=_positive_int,
+        default=DEFAULT_RPM,
+        help=f"Maximum DALL-E requests started per minute (default: {DEFAULT_RPM})"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call DALL-E, bypassing the on-disk image cache"
+    )
+    
+    parser.add_argument(
+        "--optimize", "-o",
+        action="store_true",
+        help="Re-encode PNGs to reduce file size (max compression + oxipng)"
+    )
+    
+    parser.add_argument(
+        "--palette-colors", "-p",
+        type=_palette_size,
+        metavar="N",
+        help="Quantize sprites to N colors (lossy, much smaller; implies --optimize)"
+    )
+    
     args = parser.parse_args()
     
     # List sprites if requested
     if args.list:
-        # Create a temporary generator just to list (doesn't need valid API key)
-        try:
-            gen = SpriteGenerator(api_key=args.api_key or "dummy")
-        except ValueError:
-            # If no API key, still allow listing
-            pass
-        
-        # Print sprite list manually since we might not have a valid generator
-        print("\n" + "=" * 60)
-        print("AVAILABLE SPRITES")
-        print("=" * 60)
-        
-        for name, definition in SPRITE_DEFINITIONS.items():
-            print(f"\n  {name}")
-            print(f"    File: {definition['filename']}")
-            print(f"    Description: {definition['description']}")
-        
-        print("\n" + "=" * 60)
-        print(f"Total: {len(SPRITE_DEFINITIONS)} sprites")
-        print("=" * 60 + "\n")
+        _print_definitions()
         return
     
     # Generate sprites
@@ -695,11 +826,18 @@ Environment:
         return
     
     try:
-        generator = SpriteGenerator(api_key=args.api_key)
+        generator = SpriteGenerator(
+            api_key=args.api_key,
+            max_concurrency=args.max_concurrency,
+            rpm_limit=args.rpm,
+            use_cache=not args.no_cache,
+            post_process=args.optimize or args.palette_colors is not None,
+            palette_colors=args.palette_colors
+        )
         
         if args.all:
             # Generate all sprites
-            results = generator.generate_all_sprites()
+            results = _run_event_loop(_run(generator, generator.generate_all_sprites()))
             
             # Print summary
             print("\n" + "=" * 60)
@@ -714,7 +852,7 @@ Environment:
             
         elif args.sprite:
             # Generate single sprite
-            path = generator.generate_sprite(args.sprite)
+            path = _run_event_loop(_run(generator, generator.generate_sprite(args.sprite)))
             
             if path:
                 print(f"\n✓ Successfully generated: {path}\n")